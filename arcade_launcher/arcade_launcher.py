@@ -0,0 +1,240 @@
+## Imports
+# Built-ins
+import tkinter as tk
+import argparse
+import os
+import sys
+import time
+
+# Pypi
+pass
+
+# Custom
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.append(os.path.join(REPO_DIR, 'tetris_like'))
+sys.path.append(os.path.join(REPO_DIR, 'tennis_for_two_like'))
+import tetris_like
+import tennis_for_two_like
+from tetris_like import widgetgrid, gt
+
+# The games the launcher can host
+GAMES = {
+    'tetris': ('Tetris-Like', tetris_like.TetrisMainWindow),
+    'tennis': ('Tennis For Two Like',
+        tennis_for_two_like.TennisForTwoMainWindow)
+}
+# The shared rate every game is updated at
+DEFAULT_FRAME_RATE = 60.0 # frames / second
+# How often the CPU shares are recalculated
+REPORT_INTERVAL = 1000 # ms
+
+class SchedulerClient():
+    # The handle a game schedules its updates with, it has the same after()
+    #   signature as a tkinter widget so the games do not need to know they
+    #   are sharing a scheduler
+    def __init__(self, scheduler, name):
+        self.scheduler = scheduler
+        self.name = name
+        # The CPU time spent in this game's updates
+        self.cpu_time = 0.0
+        # The CPU time at the last report and the share since then
+        self.reported_cpu_time = 0.0
+        self.cpu_share = 0.0
+        self.closed = False
+    def after(self, ms, func, *args):
+        self.scheduler._add(self, ms, func, args)
+    def close(self):
+        # Stop running this game's updates
+        self.closed = True
+        self.scheduler._remove(self)
+
+class FrameScheduler():
+    '''
+    Typical use case:
+        import tkinter as tk
+        root = tk.Tk()
+        scheduler = FrameScheduler(root, 60.0)
+        mw = TetrisMainWindow(tk.Toplevel(root),
+            scheduler=scheduler.client('Tetris-Like'))
+        root.mainloop()
+    '''
+    def __init__(self, root, rate=DEFAULT_FRAME_RATE):
+        self.master = root
+        self.period = 1.0 / rate
+        self.clients = []
+        # The callbacks waiting for a frame as (due time, client, func, args)
+        self.pending = []
+        # When the next frame is due (None while there is nothing to run)
+        self.next_deadline = None
+        # Statistics
+        self.frame_count = 0
+        self.missed_frames = 0
+        self.reported_time = gt()
+        self.reported_frame_count = 0
+        self.frame_rate = 0.0
+    def client(self, name):
+        # Create the handle a game schedules its updates with
+        client = SchedulerClient(self, name)
+        self.clients.append(client)
+        return client
+    def _add(self, client, ms, func, args):
+        # Queue a callback for the first frame at or after its delay
+        if client.closed:
+            return
+        self.pending.append((gt() + ms / 1000.0, client, func, args))
+        if self.next_deadline is None:
+            # Nothing was running, start the frames again
+            self.next_deadline = gt()
+            self.master.after(0, self._run_frame)
+    def _remove(self, client):
+        # Forget a closed game
+        self.pending = [entry for entry in self.pending if entry[1] != client]
+        if client in self.clients:
+            self.clients.remove(client)
+    def _run_frame(self):
+        # Run every callback that is due, timing each game as it goes
+        now = gt()
+        due = [entry for entry in self.pending if entry[0] <= now]
+        self.pending = [entry for entry in self.pending if entry[0] > now]
+        try:
+            for _, client, func, args in due:
+                if client.closed:
+                    continue
+                start = time.process_time()
+                try:
+                    func(*args)
+                except tk.TclError:
+                    # The game's window was destroyed under it
+                    client.close()
+                except Exception:
+                    # Report the error and stop only the game that raised it
+                    client.close()
+                    self.master.report_callback_exception(*sys.exc_info())
+                finally:
+                    client.cpu_time += time.process_time() - start
+        finally:
+            # Always schedule the next frame so that the other games keep
+            #   running whatever happened above
+            self.frame_count += 1
+            self._schedule_frame()
+    def _schedule_frame(self):
+        # Queue the next frame, or stop while nothing is pending
+        if not self.pending:
+            # Sleep until a game schedules something again
+            self.next_deadline = None
+            return
+        # Schedule the next frame for the next deadline, skipping any frames
+        #   that were missed rather than running them back to back
+        self.next_deadline += self.period
+        now = gt()
+        if now > self.next_deadline:
+            missed = int((now - self.next_deadline) / self.period) + 1
+            self.missed_frames += missed
+            self.next_deadline += missed * self.period
+        self.master.after(int(round((self.next_deadline - now) * 1000)),
+            self._run_frame)
+    def report(self):
+        # Update the frame rate and the share of a CPU each game has used
+        #   since the last report
+        now = gt()
+        elapsed = now - self.reported_time
+        if elapsed <= 0.0:
+            return
+        self.frame_rate = (self.frame_count - self.reported_frame_count) \
+            / elapsed
+        for client in self.clients:
+            client.cpu_share = (client.cpu_time - client.reported_cpu_time) \
+                / elapsed
+            client.reported_cpu_time = client.cpu_time
+        self.reported_time = now
+        self.reported_frame_count = self.frame_count
+
+class ArcadeLauncherWindow():
+    '''
+    Typical use case:
+        import tkinter as tk
+        root = tk.Tk()
+        mw = ArcadeLauncherWindow(root)
+        mw.open_game('tetris')
+        root.mainloop()
+    '''
+    def __init__(self, root, rate=DEFAULT_FRAME_RATE):
+        self.master = root
+        self.master.title('Arcade')
+        # The scheduler shared by every hosted game
+        self.scheduler = FrameScheduler(root, rate)
+        # The open games as (window, client) pairs
+        self.games = []
+        # How many games have been opened (to number their windows)
+        self.opened_count = 0
+        self.mainframe = widgetgrid(tk.Frame, {'master': self.master},
+            {'row': 0, 'column': 0})
+        # A button to start each game
+        for column, (key, (title, cls)) in enumerate(GAMES.items()):
+            widgetgrid(tk.Button,
+                {'master': self.mainframe, 'text': title,
+                    'command': lambda key=key: self.open_game(key)},
+                {'row': 0, 'column': column})
+        # This label shows the shared frame rate
+        self.ratelabel = widgetgrid(tk.Label,
+            {'master': self.mainframe, 'text': ''},
+            {'row': 1, 'column': 0, 'columnspan': 99})
+        # This label shows each game's CPU share
+        self.cpulabel = widgetgrid(tk.Label,
+            {'master': self.mainframe, 'text': '', 'justify': 'left'},
+            {'row': 2, 'column': 0, 'columnspan': 99})
+        self.master.after(REPORT_INTERVAL, self._report)
+    def open_game(self, key):
+        # Host a new game in its own window under the launcher's root
+        title, cls = GAMES[key]
+        top = tk.Toplevel(self.master)
+        self.opened_count += 1
+        client = self.scheduler.client(
+            '{0} #{1}'.format(title, self.opened_count))
+        window = cls(top, scheduler=client)
+        top.protocol('WM_DELETE_WINDOW',
+            lambda: self.close_game(top, client))
+        self.games.append((window, client))
+        return window
+    def close_game(self, top, client):
+        # Stop the game's updates before its widgets are destroyed
+        client.close()
+        self.games = [game for game in self.games if game[1] != client]
+        top.destroy()
+    def report_text(self):
+        # The frame rate and CPU share of each game as display text
+        rate = '{0:.1f} / {1:.1f} frames per second, {2} missed'.format(
+            self.scheduler.frame_rate, 1.0 / self.scheduler.period,
+            self.scheduler.missed_frames)
+        shares = '\n'.join('{0}: {1:5.1f}% CPU'.format(client.name,
+            client.cpu_share * 100) for client in self.scheduler.clients)
+        return rate, shares
+    def _report(self):
+        # Refresh the statistics and schedule the next refresh
+        self.scheduler.report()
+        rate, shares = self.report_text()
+        self.ratelabel.config(text=rate)
+        self.cpulabel.config(text=shares)
+        self.master.after(REPORT_INTERVAL, self._report)
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description='Host several games in one process')
+    parser.add_argument('games', nargs='*', default=[],
+        help='games to open straight away ({0})'.format(', '.join(GAMES)))
+    parser.add_argument('--rate', type=float, default=DEFAULT_FRAME_RATE,
+        help='the shared frame rate in frames per second')
+    args = parser.parse_args()
+    unknown = [key for key in args.games if key not in GAMES]
+    if unknown:
+        parser.error('unknown games: {0}'.format(', '.join(unknown)))
+    root = tk.Tk()
+    mw = ArcadeLauncherWindow(root, args.rate)
+    for key in args.games:
+        mw.open_game(key)
+    root.mainloop()
+    for line in mw.report_text():
+        print(line)
+
+if __name__ == '__main__':
+    _main()
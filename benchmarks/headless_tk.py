@@ -0,0 +1,133 @@
+## Imports
+# Built-ins
+import itertools
+import traceback
+
+# Pypi
+pass
+
+# Custom
+pass
+
+# Headless stand-ins for the few tkinter widgets the games use so that the
+#   game logic can be run and timed without a display. Replace a game
+#   module's tk with this module before creating a window:
+#       tetris_like.tk = headless_tk
+#       mw = tetris_like.TetrisMainWindow(headless_tk.Tk())
+
+class TclError(Exception):
+    pass
+
+class Tk():
+    # The root window only records what the game schedules, the caller
+    #   decides when (and if) scheduled calls run
+    def __init__(self):
+        self.scheduled = []
+        self.bindings = {}
+        self.window_title = ''
+        self.ids = itertools.count(1)
+    def title(self, text=None):
+        if text is None:
+            return self.window_title
+        self.window_title = text
+    def bind(self, sequence, func):
+        self.bindings[sequence] = func
+    def protocol(self, name, func):
+        self.bindings[name] = func
+    def after(self, ms, func, *args):
+        self.scheduled.append((ms, func, args))
+        return 'after#{0}'.format(next(self.ids))
+    def after_cancel(self, after_id):
+        pass
+    def report_callback_exception(self, exc, val, tb):
+        # Print the traceback like tkinter does for a failing callback
+        traceback.print_exception(exc, val, tb)
+    def run_pending(self):
+        # Run everything scheduled so far (ignoring the delays)
+        scheduled, self.scheduled = self.scheduled, []
+        for ms, func, args in scheduled:
+            func(*args)
+    def destroy(self):
+        self.scheduled = []
+
+class Toplevel(Tk):
+    def __init__(self, master=None, **options):
+        super().__init__()
+        self.master = master
+
+class Widget():
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = options
+    def grid(self, **options):
+        pass
+    def place(self, **options):
+        pass
+    def config(self, **options):
+        self.options.update(options)
+    configure = config
+    def cget(self, option):
+        return self.options.get(option, '')
+    def after(self, ms, func, *args):
+        return self.master.after(ms, func, *args)
+
+class Frame(Widget):
+    pass
+
+class Label(Widget):
+    pass
+
+class Button(Widget):
+    pass
+
+class Canvas(Widget):
+    # Items are kept as their coordinate lists so that coords, move and
+    #   find_overlapping behave like the real canvas for the games' shapes
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.items = {}
+        self.ids = itertools.count(1)
+    def _create(self, *coords, **options):
+        # Coordinates may be passed flat or as a single sequence
+        if len(coords) == 1:
+            coords = coords[0]
+        handle = next(self.ids)
+        self.items[handle] = [float(value) for value in coords]
+        return handle
+    create_rectangle = _create
+    create_oval = _create
+    create_arc = _create
+    create_line = _create
+    create_text = _create
+    def delete(self, *handles):
+        for handle in handles:
+            if handle == 'all':
+                self.items.clear()
+            else:
+                self.items.pop(handle, None)
+    def coords(self, handle, *coords):
+        if coords:
+            if len(coords) == 1:
+                coords = coords[0]
+            self.items[handle] = [float(value) for value in coords]
+            return None
+        return list(self.items.get(handle, []))
+    def move(self, handle, dx, dy):
+        coords = self.items.get(handle)
+        if coords is None:
+            return
+        for index in range(0, len(coords), 2):
+            coords[index] += dx
+            coords[index + 1] += dy
+    def find_overlapping(self, x0, y0, x1, y1):
+        # Items whose bounding box touches the rectangle
+        found = []
+        for handle, coords in self.items.items():
+            if len(coords) < 4:
+                continue
+            xs = coords[0::2]
+            ys = coords[1::2]
+            if min(xs) <= x1 and max(xs) >= x0 \
+                    and min(ys) <= y1 and max(ys) >= y0:
+                found.append(handle)
+        return tuple(found)
@@ -0,0 +1,397 @@
+## Imports
+# Built-ins
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Pypi
+pass
+
+# Custom
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.append(os.path.join(REPO_DIR, 'tetris_like'))
+sys.path.append(os.path.join(REPO_DIR, 'tennis_for_two_like'))
+import headless_tk
+import tetris_like
+import tetris_event_log
+import tennis_for_two_like
+# Run the games against the headless widgets
+tetris_like.tk = headless_tk
+tennis_for_two_like.tk = headless_tk
+
+# Where the baseline results are stored
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'baseline.json')
+# How much slower than the baseline a benchmark may get before failing
+DEFAULT_THRESHOLD = 0.25 # fraction
+# How many times each benchmark is repeated (the fastest is reported as
+#   the slower runs are mostly noise from the rest of the machine)
+DEFAULT_REPEAT = 15
+# How many whole games each macro benchmark plays per repeat
+GAMES_PER_REPEAT = 5
+# How many iterations the calibration loop runs, every result is stored as
+#   a multiple of the loop's time so that the baseline carries over between
+#   runs and machines of different speeds
+CALIBRATION_ITERATIONS = 20000
+# How many runs of the suite a new baseline is the median of, so that one
+#   unusually fast run does not become the baseline
+DEFAULT_BASELINE_RUNS = 3
+# The seed used for every random board, bot and game
+SEED = 1234
+# The fixed step used to advance Tennis For Two Like
+TENNIS_TICK = 0.01 # seconds
+# How long each Tennis rally runs for
+TENNIS_RALLY_TICKS = 2000
+
+# A convenience function to time one call, excluding its setup
+#   The garbage collector is paused while timing (as timeit does) so that a
+#   collection triggered by earlier work is not charged to the calls
+def timed(setup, run, number):
+    total = 0.0
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(number):
+            state = setup()
+            start = time.perf_counter()
+            run(state)
+            total += time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+    return total / number
+
+def calibration_loop(iterations=CALIBRATION_ITERATIONS):
+    # A fixed mix of the work the games spend their time on: float maths,
+    #   list and dict updates and method calls
+    values = []
+    lookup = {}
+    total = 0.0
+    for index in range(iterations):
+        x = (index * 0.5 + 1.0) / 3.0
+        values.append(x)
+        lookup[index & 255] = values[-1]
+        if len(values) > 64:
+            total += max(values) - min(values)
+            values.clear()
+    return total + sum(lookup.values())
+
+def bench_calibration():
+    return timed(lambda: CALIBRATION_ITERATIONS, calibration_loop, 5)
+
+## Tetris helpers
+def new_tetris(seed=SEED):
+    return tetris_like.TetrisMainWindow(headless_tk.Tk(), seed=seed)
+
+def fill_board(mw, gaps, seed=SEED):
+    # Lock blocks into the bottom rows of the board, gaps holds how many
+    #   random blocks are missing from each row (from the top down)
+    rng = random.Random(seed)
+    mw.gamecanvas.delete('all')
+    mw.all_blocks = []
+    first_row = tetris_like.GAME_HEIGHT - len(gaps)
+    for row, row_gaps in enumerate(gaps, first_row):
+        missing = set(rng.sample(range(tetris_like.GAME_WIDTH), row_gaps))
+        for column in range(tetris_like.GAME_WIDTH):
+            if column in missing:
+                continue
+            colour = tetris_like.shapes[rng.randrange(
+                len(tetris_like.shapes))]['colour']
+            handle = mw._draw_shape({'parts': [[(0, 0)]], 'colour': colour},
+                mw.gamecanvas, (column, row))[0]['handle']
+            mw.all_blocks.append([column, row, handle, colour])
+    return mw
+
+def choose_placement(mw, bot):
+    # Pick the rotation and column that leaves the fewest gaps under the
+    #   current piece and keeps its top lowest (ties are broken at random)
+    tops = [tetris_like.GAME_HEIGHT] * tetris_like.GAME_WIDTH
+    for block in mw.all_blocks:
+        tops[block[0]] = min(tops[block[0]], block[1])
+    best_score = None
+    best = []
+    parts = mw.current_piece['parts']
+    for rot, rot_parts in enumerate(parts):
+        width = max(part[0] for part in rot_parts) + 1
+        for column in range(tetris_like.GAME_WIDTH - width + 1):
+            rest = min(tops[column + part[0]] - part[1]
+                for part in rot_parts) - 1
+            bottoms = {}
+            for part in rot_parts:
+                bottoms[part[0]] = max(bottoms.get(part[0], -1),
+                    rest + part[1])
+            gaps = sum(tops[column + x] - y - 1 for x, y in bottoms.items())
+            score = (-gaps, rest + min(part[1] for part in rot_parts))
+            if best_score is None or score > best_score:
+                best_score = score
+                best = []
+            if score == best_score:
+                best.append((rot, column))
+    return bot.choice(best)
+
+def play_tetris(seed=SEED, event_log=None):
+    # Play a whole game with a seeded bot that steers each piece above its
+    #   chosen placement and then drops it an update at a time
+    mw = tetris_like.TetrisMainWindow(headless_tk.Tk(), seed=seed,
+        event_log=event_log)
+    bot = random.Random(seed)
+    stone_count = None
+    previous_placement = None
+    while mw.update_rate:
+        if stone_count != mw.stone_count:
+            # A new piece, pick where to put it
+            stone_count = mw.stone_count
+            target_rot, target_column = choose_placement(mw, bot)
+        mw.keys = []
+        if mw.current_piece_rot < target_rot:
+            mw.keys.append('Up')
+        if mw.current_pos[0] < target_column:
+            mw.keys.append('Right')
+        elif mw.current_pos[0] > target_column:
+            mw.keys.append('Left')
+        # Only drop once the piece is in place (or is blocked)
+        placement = (mw.current_pos[0], mw.current_piece_rot)
+        if mw.keys and placement != previous_placement:
+            mw.last_update = tetris_like.gt()
+        else:
+            mw.last_update = float('-inf')
+        previous_placement = placement
+        mw._update(mw.run_id)
+        mw.master.scheduled.clear()
+    return mw
+
+## Tennis helpers
+def new_tennis():
+    return tennis_for_two_like.TennisForTwoMainWindow(headless_tk.Tk())
+
+def place_ball(mw, x, y, velocity, last_strike='left'):
+    # Put the ball somewhere on the court with the given velocity
+    r = tennis_for_two_like.BALL_RADIUS
+    mw.mainview.coords(mw.ball, x - r, y - r, x + r, y + r)
+    mw.ball_velocity = list(velocity)
+    mw.last_strike = last_strike
+    mw.bounces = 0
+    mw.inputs = set()
+    return mw
+
+def play_tennis(seed=SEED, ticks=TENNIS_RALLY_TICKS):
+    # Play rallies between two seeded bots that each steer to a random angle
+    #   and strike once the ball is close enough
+    mw = new_tennis()
+    bot = random.Random(seed)
+    aims = {'left': 0.0, 'right': 0.0}
+    last_strike = 'start'
+    for _ in range(ticks):
+        if mw.last_strike != last_strike:
+            # Somebody struck the ball (or a point started), re-aim
+            last_strike = mw.last_strike
+            aims = {'left': bot.uniform(30.0, 45.0),
+                'right': 180.0 - bot.uniform(30.0, 45.0)}
+        ball_pos = mw.mainview.coords(mw.ball)
+        ball_x = (ball_pos[0] + ball_pos[2]) / 2
+        mw.inputs = set()
+        if mw.player_input_left < aims['left'] - 1.0:
+            mw.inputs.add('w')
+        elif mw.player_input_left > aims['left'] + 1.0:
+            mw.inputs.add('s')
+        elif ball_x < 0.3 * tennis_for_two_like.COURT_WIDTH:
+            mw.inputs.add('d')
+        if mw.player_input_right > aims['right'] + 1.0:
+            mw.inputs.add('Up')
+        elif mw.player_input_right < aims['right'] - 1.0:
+            mw.inputs.add('Down')
+        elif ball_x > 0.7 * tennis_for_two_like.COURT_WIDTH:
+            mw.inputs.add('Left')
+        mw._step(TENNIS_TICK, TENNIS_TICK)
+        mw.master.scheduled.clear()
+    return mw
+
+## The benchmarks
+def bench_tetris_collision_empty():
+    mw = new_tetris()
+    return timed(lambda: mw, lambda mw: mw._check_collisions(), 2000)
+
+def bench_tetris_collision_stacked():
+    mw = fill_board(new_tetris(), [1] * (tetris_like.GAME_HEIGHT - 4))
+    return timed(lambda: mw, lambda mw: mw._check_collisions(), 500)
+
+def bench_tetris_row_clear_full():
+    # Four full rows under a near-full stack
+    mw = new_tetris()
+    setup = lambda: fill_board(mw,
+        [1] * (tetris_like.GAME_HEIGHT - 8) + [0] * 4)
+    return timed(setup, lambda mw: mw._process_row_clearance(), 100)
+
+def bench_tetris_row_clear_near_full():
+    # Every row is missing one block so nothing is cleared
+    mw = new_tetris()
+    setup = lambda: fill_board(mw, [1] * (tetris_like.GAME_HEIGHT - 4))
+    return timed(setup, lambda mw: mw._process_row_clearance(), 100)
+
+def bench_tetris_spawn():
+    mw = new_tetris()
+    return timed(lambda: mw, lambda mw: mw._spawn_piece(), 2000)
+
+def bench_tetris_idle_update():
+    # An update with no input where the piece is not due to move
+    mw = new_tetris()
+    def setup():
+        mw.last_update = tetris_like.gt()
+        return mw
+    return timed(setup, lambda mw: mw._update(mw.run_id), 2000)
+
+def bench_tennis_step_flight():
+    mw = new_tennis()
+    setup = lambda: place_ball(mw, 300.0, 200.0, (250.0, -100.0))
+    return timed(setup, lambda mw: mw._step(TENNIS_TICK, TENNIS_TICK), 2000)
+
+def bench_tennis_step_bounce():
+    mw = new_tennis()
+    setup = lambda: place_ball(mw, 600.0,
+        tennis_for_two_like.COURT_BOUNDS[1], (250.0, 100.0))
+    return timed(setup, lambda mw: mw._step(TENNIS_TICK, TENNIS_TICK), 2000)
+
+def bench_tetris_game():
+    return timed(lambda: SEED, play_tetris, GAMES_PER_REPEAT)
+
+def bench_tetris_game_logged():
+    # The same game while writing the event log
+    def run(path):
+        event_log = tetris_event_log.EventLogWriter(path)
+        play_tetris(SEED, event_log)
+        event_log.close()
+        os.remove(path)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.bin')
+        return timed(lambda: path, run, GAMES_PER_REPEAT)
+
+def bench_tennis_rally():
+    return timed(lambda: SEED, play_tennis, GAMES_PER_REPEAT)
+
+BENCHMARKS = {
+    # Micro benchmarks (seconds per call)
+    'tetris_collision_empty': bench_tetris_collision_empty,
+    'tetris_collision_stacked': bench_tetris_collision_stacked,
+    'tetris_row_clear_full': bench_tetris_row_clear_full,
+    'tetris_row_clear_near_full': bench_tetris_row_clear_near_full,
+    'tetris_spawn': bench_tetris_spawn,
+    'tetris_idle_update': bench_tetris_idle_update,
+    'tennis_step_flight': bench_tennis_step_flight,
+    'tennis_step_bounce': bench_tennis_step_bounce,
+    # Macro benchmarks (seconds per game)
+    'tetris_game': bench_tetris_game,
+    'tetris_game_logged': bench_tetris_game_logged,
+    'tennis_rally': bench_tennis_rally,
+}
+
+def run(names, repeat):
+    # Run each benchmark once to warm up, then several times keeping the
+    #   fastest. The calibration loop is timed between the repeats so that
+    #   it sees the same state of the machine as the benchmark, and each
+    #   result is returned as a multiple of it along with its time
+    results = {}
+    times = {}
+    for name in names:
+        BENCHMARKS[name]()
+        bench_calibration()
+        calibration = float('inf')
+        best = float('inf')
+        for _ in range(repeat):
+            calibration = min(calibration, bench_calibration())
+            best = min(best, BENCHMARKS[name]())
+        results[name] = best / calibration
+        times[name] = best
+    return results, times
+
+def slower(results, baseline, threshold):
+    # The benchmarks slower than the baseline by more than the threshold
+    return [name for name, value in results.items()
+        if baseline.get(name) and value / baseline[name] > 1 + threshold]
+
+def compare(results, times, baseline, threshold):
+    # Print the results against the baseline and return the regressions
+    regressions = []
+    print('{0:<28}{1:>14}{2:>12}{3:>12}{4:>9}'.format(
+        'benchmark', 'time', 'baseline', 'current', 'ratio'))
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base:
+            ratio = value / base
+            status = ''
+            if ratio > 1 + threshold:
+                status = '  SLOWER'
+                regressions.append(name)
+            print('{0:<28}{1:>11.2f} us{2:>12.4g}{3:>12.4g}{4:>8.2f}x{5}'
+                .format(name, times[name] * 1e6, base, value, ratio, status))
+        else:
+            print('{0:<28}{1:>11.2f} us{2:>12}{3:>12.4g}'.format(
+                name, times[name] * 1e6, '-', value))
+    return regressions
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description='Run the headless benchmarks for both games')
+    parser.add_argument('names', nargs='*', default=list(BENCHMARKS),
+        help='the benchmarks to run (default: all)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='the allowed slow down before failing, as a fraction')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+        help='how many times to repeat each benchmark')
+    parser.add_argument('--update-baseline', action='store_true',
+        help='store these results as the new baseline')
+    parser.add_argument('--baseline-runs', type=int,
+        default=DEFAULT_BASELINE_RUNS,
+        help='how many runs a new baseline is the median of')
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error('unknown benchmarks: {0}'.format(', '.join(unknown)))
+    # Load the stored baseline
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as fh:
+            baseline = json.load(fh)['results']
+    if args.update_baseline:
+        runs = [run(args.names, args.repeat)
+            for _ in range(args.baseline_runs)]
+        results = {name: statistics.median(run_results[name]
+            for run_results, _ in runs) for name in args.names}
+        times = {name: statistics.median(run_times[name]
+            for _, run_times in runs) for name in args.names}
+        baseline.update(results)
+        with open(BASELINE_PATH, 'w') as fh:
+            json.dump({'python': platform.python_version(),
+                'machine': platform.machine(),
+                'calibration_iterations': CALIBRATION_ITERATIONS,
+                'results': baseline}, fh, indent=4, sort_keys=True)
+            fh.write('\n')
+        compare(results, times, {}, args.threshold)
+        return 0
+    results, times = run(args.names, args.repeat)
+    # A slow down has to show up twice to count, the faster of the two
+    #   runs is kept
+    retry = slower(results, baseline, args.threshold)
+    if retry:
+        retry_results, retry_times = run(retry, args.repeat)
+        for name in retry:
+            if retry_results[name] < results[name]:
+                results[name] = retry_results[name]
+                times[name] = retry_times[name]
+    regressions = compare(results, times, baseline, args.threshold)
+    if regressions:
+        print('{0} benchmark(s) slower than the baseline by more than '
+            '{1:.0%}: {2}'.format(len(regressions), args.threshold,
+                ', '.join(regressions)))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(_main())
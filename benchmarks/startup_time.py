@@ -0,0 +1,128 @@
+## Imports
+# Built-ins
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Pypi
+pass
+
+# Custom
+pass
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCHMARK_DIR, os.pardir)
+# The games, their directories and main window classes
+GAMES = {
+    'tetris_like': ('tetris_like', 'TetrisMainWindow'),
+    'tennis_for_two_like': ('tennis_for_two_like', 'TennisForTwoMainWindow'),
+}
+# How long launching a game may take before its first update has run
+DEFAULT_TARGET = 0.5 # seconds
+# How many launches to time (the fastest is reported)
+DEFAULT_REPEAT = 5
+# How many of the slowest imports to list
+TOP_IMPORTS = 8
+# The program run in a fresh interpreter to time the first frame, it exits
+#   as soon as the first update has returned
+FIRST_FRAME_PROGRAM = '''
+import os, sys
+if {headless}:
+    import headless_tk as tk
+else:
+    import tkinter as tk
+import {module} as game
+if {headless}:
+    game.tk = tk
+original = game.{cls}._update
+def first_update(self, *args):
+    original(self, *args)
+    sys.stdout.write('first frame\\n')
+    sys.stdout.flush()
+    os._exit(0)
+game.{cls}._update = first_update
+root = tk.Tk()
+game.{cls}(root)
+if {headless}:
+    root.run_pending()
+else:
+    root.mainloop()
+'''
+
+def _env(game_dir):
+    # The environment the games are launched in
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([game_dir, BENCHMARK_DIR])
+    return env
+
+def import_times(module, game_dir):
+    # Import the game in a fresh interpreter with -X importtime and return
+    #   the cumulative import time (in seconds) of each module
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        env=_env(game_dir), capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+def time_to_first_frame(module, cls, game_dir, headless):
+    # Launch the game in a fresh interpreter and time how long it takes for
+    #   the first update to finish
+    program = FIRST_FRAME_PROGRAM.format(module=module, cls=cls,
+        headless=headless)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', program],
+        env=_env(game_dir), capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if 'first frame' not in result.stdout:
+        raise RuntimeError('{0} did not reach its first frame:\n{1}'.format(
+            module, result.stderr))
+    return elapsed
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description='Report import times and time to first frame')
+    parser.add_argument('games', nargs='*', default=list(GAMES),
+        help='the games to measure (default: all)')
+    parser.add_argument('--target', type=float, default=DEFAULT_TARGET,
+        help='the time to first frame to stay under, in seconds')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+        help='how many launches to time')
+    parser.add_argument('--headless', action='store_true',
+        default=sys.platform.startswith('linux') \
+            and not os.environ.get('DISPLAY'),
+        help='use the headless widgets (default when there is no display)')
+    args = parser.parse_args()
+    failed = []
+    for module in args.games:
+        directory, cls = GAMES[module]
+        game_dir = os.path.join(REPO_DIR, directory)
+        # Report the slowest imports
+        times = import_times(module, game_dir)
+        print('{0}: import {1:.1f} ms{2}'.format(module,
+            times[module] * 1000,
+            ' (numpy imported)' if 'numpy' in times else ''))
+        slowest = sorted(times.items(), key=lambda item: -item[1])
+        for name, cumulative in slowest[1:TOP_IMPORTS + 1]:
+            print('    {0:<32}{1:8.1f} ms'.format(name, cumulative * 1000))
+        # Time the launches
+        first_frame = min(time_to_first_frame(module, cls, game_dir,
+            args.headless) for _ in range(args.repeat))
+        status = ''
+        if first_frame > args.target:
+            status = '  OVER TARGET'
+            failed.append(module)
+        print('    time to first frame{0} {1:7.1f} ms (target {2:.0f} ms)'
+            '{3}'.format(' (headless)' if args.headless else '',
+                first_frame * 1000, args.target * 1000, status))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(_main())
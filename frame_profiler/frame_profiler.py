@@ -0,0 +1,225 @@
+## Imports
+# Built-ins
+import tkinter as tk
+import array
+import atexit
+import itertools
+import json
+import os
+import time
+
+# Pypi
+pass
+
+# Custom
+pass
+
+# Setting this environment variable switches the profiler on in the games
+PROFILE_ENV = 'SIMPLE_GAMES_PROFILE'
+# Setting this environment variable also shows the frame times on screen
+OVERLAY_ENV = 'SIMPLE_GAMES_OVERLAY'
+# The directory the trace files are written to (defaults to the current one)
+TRACE_DIR_ENV = 'SIMPLE_GAMES_TRACE_DIR'
+# How many frames and timed calls are kept, older ones are overwritten
+FRAME_CAPACITY = 4096
+EVENT_CAPACITY = 65536
+# How often to refresh the on-screen overlay
+OVERLAY_INTERVAL = 500 # ms
+# The name of the phase that covers a whole update
+FRAME_PHASE = 'frame'
+# Each profiler is shown as its own thread in the trace viewer
+_trace_ids = itertools.count(1)
+
+# The timing function used for all measurements
+perf_counter = time.perf_counter
+
+class FrameProfiler():
+    '''
+    Typical use case:
+        profiler = FrameProfiler('Game', ['input', 'draw'])
+        game._update = profiler.frame(game._update)
+        game._draw = profiler.phase(game._draw, 'draw')
+        ...
+        print(profiler.percentiles())
+        profiler.dump_trace('game_trace.json')
+    '''
+    def __init__(self, name, phases, frame_capacity=FRAME_CAPACITY,
+            event_capacity=EVENT_CAPACITY):
+        self.name = name
+        self.trace_id = next(_trace_ids)
+        # Phase 0 is the whole frame, the rest are the timed calls
+        self.phase_names = [FRAME_PHASE] + list(phases)
+        # The frame ring buffer holds a row of start time, duration and the
+        #   time spent in each phase (less any phases it called) for every
+        #   frame
+        self.frame_capacity = frame_capacity
+        self.frame_width = len(self.phase_names) + 1
+        self.frames = array.array('d', [0.0]) \
+            * (frame_capacity * self.frame_width)
+        self.frame_count = 0
+        # The event ring buffer holds the start time and duration of every
+        #   timed call along with its phase for the trace export
+        self.event_capacity = event_capacity
+        self.event_times = array.array('d', [0.0]) * (event_capacity * 2)
+        self.event_phases = array.array('H', [0]) * event_capacity
+        self.event_count = 0
+        # The phase totals of the frame in progress (None between frames)
+        self.frame_start = None
+        self.frame_phases = [0.0] * len(self.phase_names)
+        # The time spent in phases called from each phase in progress, so
+        #   that a phase's total only counts its own time
+        self.child_times = []
+        # The overlay label, if shown
+        self.overlay = None
+
+    def frame(self, func):
+        # Wrap the function that performs one whole update
+        def wrapper(*args, **kwargs):
+            if self.frame_start is not None:
+                # Already inside a frame
+                return func(*args, **kwargs)
+            start = perf_counter()
+            self.frame_start = start
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.frame_start = None
+                self._record_frame(start, perf_counter())
+        return wrapper
+
+    def phase(self, func, name):
+        # Wrap a function so its time is added to the named phase
+        index = self.phase_names.index(name)
+        def wrapper(*args, **kwargs):
+            self.child_times.append(0.0)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = perf_counter()
+                children = self.child_times.pop()
+                if self.child_times:
+                    # Take this call off the total of the phase that called it
+                    self.child_times[-1] += end - start
+                # The trace keeps the whole call (the viewer shows the nested
+                #   calls inside it) but the frame totals only count the time
+                #   not spent in other phases
+                self._record_event(index, start, end)
+                if self.frame_start is not None:
+                    self.frame_phases[index] += end - start - children
+        return wrapper
+
+    def _record_event(self, index, start, end):
+        # Store a timed call in the event ring buffer
+        slot = self.event_count % self.event_capacity
+        self.event_times[2 * slot] = start
+        self.event_times[2 * slot + 1] = end - start
+        self.event_phases[slot] = index
+        self.event_count += 1
+
+    def _record_frame(self, start, end):
+        # Store the frame and its phase totals in the frame ring buffer
+        self._record_event(0, start, end)
+        row = (self.frame_count % self.frame_capacity) * self.frame_width
+        self.frames[row] = start
+        self.frames[row + 1] = end - start
+        for index in range(1, len(self.phase_names)):
+            self.frames[row + 1 + index] = self.frame_phases[index]
+            self.frame_phases[index] = 0.0
+        self.frame_count += 1
+
+    def percentiles(self, fractions=(0.5, 0.99)):
+        # Calculate frame time percentiles (in seconds) over the frames
+        #   still held in the ring buffer
+        count = min(self.frame_count, self.frame_capacity)
+        if not count:
+            return [0.0 for fraction in fractions]
+        durations = sorted(self.frames[row * self.frame_width + 1]
+            for row in range(count))
+        return [durations[min(count - 1, int(fraction * count))]
+            for fraction in fractions]
+
+    def phase_means(self):
+        # Calculate the mean time (in seconds) each phase takes per frame,
+        #   not counting the phases called from it
+        count = min(self.frame_count, self.frame_capacity)
+        means = {}
+        for index, name in enumerate(self.phase_names[1:], 1):
+            total = sum(self.frames[row * self.frame_width + 1 + index]
+                for row in range(count))
+            means[name] = total / count if count else 0.0
+        return means
+
+    def show_overlay(self, master):
+        # Draw the frame times over the top left corner of the window
+        self.overlay = tk.Label(master=master, text='', justify='left',
+            anchor='nw', bg='#000000', fg='#00FF00', font=('Courier', 8))
+        self.overlay.place(x=0, y=0)
+        self._refresh_overlay()
+
+    def _refresh_overlay(self):
+        # Update the overlay text and schedule the next refresh
+        try:
+            p50, p99 = self.percentiles()
+            lines = ['p50 {0:6.2f} ms  p99 {1:6.2f} ms'.format(
+                p50 * 1000, p99 * 1000)]
+            for name, mean in self.phase_means().items():
+                lines.append('{0:<14}{1:6.3f} ms'.format(name, mean * 1000))
+            self.overlay.config(text='\n'.join(lines))
+            self.overlay.after(OVERLAY_INTERVAL, self._refresh_overlay)
+        except tk.TclError:
+            # The window has been closed
+            pass
+
+    def trace_events(self):
+        # Convert the event ring buffer into Chrome trace_event entries
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid,
+            'tid': self.trace_id, 'args': {'name': self.name}}]
+        count = min(self.event_count, self.event_capacity)
+        for number in range(self.event_count - count, self.event_count):
+            slot = number % self.event_capacity
+            events.append({
+                'name': self.phase_names[self.event_phases[slot]],
+                'ph': 'X',
+                'ts': self.event_times[2 * slot] * 1e6,
+                'dur': self.event_times[2 * slot + 1] * 1e6,
+                'pid': pid,
+                'tid': self.trace_id
+            })
+        return events
+
+    def dump_trace(self, path):
+        # Write the events to a file that chrome://tracing or Perfetto opens
+        with open(path, 'w') as fh:
+            json.dump({'traceEvents': self.trace_events(),
+                'displayTimeUnit': 'ms'}, fh)
+        return path
+
+def _resolve(obj, path):
+    # Follow a dotted attribute path such as 'gamecanvas.delete', returning
+    #   the object that holds the final attribute and its name
+    *owners, attr = path.split('.')
+    for owner in owners:
+        obj = getattr(obj, owner)
+    return obj, attr
+
+def attach(window, frame_method, phases, name=None):
+    # Instrument a game window in place
+    #   frame_method names the update method and phases maps each phase
+    #   name to the dotted method paths (relative to the window) timed in it
+    profiler = FrameProfiler(name or type(window).__name__, phases)
+    setattr(window, frame_method,
+        profiler.frame(getattr(window, frame_method)))
+    for phase_name, paths in phases.items():
+        for path in paths:
+            owner, attr = _resolve(window, path)
+            setattr(owner, attr,
+                profiler.phase(getattr(owner, attr), phase_name))
+    if os.environ.get(OVERLAY_ENV):
+        profiler.show_overlay(window.master)
+    # Write the trace when the program exits
+    trace_path = os.path.join(os.environ.get(TRACE_DIR_ENV, os.curdir),
+        '{0}_{1}_trace.json'.format(profiler.name, profiler.trace_id))
+    atexit.register(profiler.dump_trace, trace_path)
+    return profiler
@@ -2,12 +2,22 @@
 # Built-ins
 import tkinter as tk
 import time
+import math
+import os
+import sys
 
 # Pypi
-import numpy as np
+pass
 
 # Custom
-pass
+# The frame profiler is only imported when it has been switched on so that
+#   it costs nothing otherwise
+if os.environ.get('SIMPLE_GAMES_PROFILE'):
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        os.pardir, 'frame_profiler'))
+    import frame_profiler
+else:
+    frame_profiler = None
 
 # The size of the court area
 COURT_WIDTH = 800
@@ -54,6 +64,16 @@ INPUT_MAX = 55.0  # degrees
 # How fast to steer the paddles while holding down the key
 INPUT_RATE = 150.0 # degrees / second
 
+# The calls timed by the frame profiler in each phase of an update
+PROFILE_PHASES = {
+    'input': ['_process_player_inputs'],
+    'collision': ['mainview.find_overlapping'],
+    'canvas': ['mainview.coords', 'mainview.move',
+        'player_canvas_left.create_arc', 'player_canvas_left.delete',
+        'player_canvas_right.create_arc', 'player_canvas_right.delete'],
+    'labels': ['player_score_left_label.config',
+        'player_score_right_label.config']
+}
 # A convenience function to make it shorter to make and grid widgets
 def widgetgrid(widget, widget_options, grid_options):
     # Create the widget
@@ -74,8 +94,11 @@ class TennisForTwoMainWindow():
         mw = TennisForTwoMainWindow(root)
         root.mainloop()
     '''
-    def __init__(self, root):
+    def __init__(self, root, scheduler=None):
         self.master = root
+        # What the updates are scheduled with (a shared frame scheduler
+        #   when hosted with other games, otherwise the window itself)
+        self.scheduler = scheduler or root
         self.master.title('Tennis For Two Like')
         # The mainframe contains all of the game content
         self.mainframe = widgetgrid(
@@ -150,6 +173,11 @@ class TennisForTwoMainWindow():
         self.bounces = None
         # Whether or not the game is still running
         self.running = False
+        # Time each update if the frame profiler is switched on
+        self.profiler = None
+        if frame_profiler:
+            self.profiler = frame_profiler.attach(self, '_update',
+                PROFILE_PHASES)
         
         # Draw the field components (net, court)
         self._draw_field()
@@ -208,7 +236,7 @@ class TennisForTwoMainWindow():
         self.bounces = 0
         # Start the game (ball moves only after a player hits strike)
         self.running = True
-        self.master.after(1, self._update)
+        self.scheduler.after(1, self._update)
         
     def _update(self):
         if not self.running:
@@ -216,8 +244,16 @@ class TennisForTwoMainWindow():
         
         dt = gt(self.last_update_time)
         self.last_update_time = gt()
-        
-        left_strike, right_strike = self._process_player_inputs()
+        # Advance the game, if a player scored then setup has already
+        #   scheduled the next update
+        if not self._step(dt):
+            return
+        # Re-call this function for the next update
+        self.scheduler.after(10, self._update)
+    def _step(self, dt, input_dt=None):
+        # Advance the game by dt seconds using the keys held in self.inputs
+        #   Returns False if a player scored and the game was reset
+        left_strike, right_strike = self._process_player_inputs(input_dt)
         self._draw_player_inputs()
         
         player_scored_left = False
@@ -234,9 +270,10 @@ class TennisForTwoMainWindow():
                 and self.ball_velocity[0] <= 0.0:
             # If the ball is moving left, on the left side and left player
             #   hits strike, then process the strike
+            angle = math.radians(self.player_input_left)
             self.ball_velocity = [
-                BALL_VELOCITY * np.cos(np.radians(self.player_input_left)),
-                -BALL_VELOCITY * np.sin(np.radians(self.player_input_left))
+                BALL_VELOCITY * math.cos(angle),
+                -BALL_VELOCITY * math.sin(angle)
             ]
             self.last_strike = 'left'
             self.bounces = 0
@@ -246,14 +283,15 @@ class TennisForTwoMainWindow():
                 and self.ball_velocity[0] >= 0.0:
             # If the ball is moving right, on the right side and right player
             #   hits strike, then process the strike
+            angle = math.radians(self.player_input_right)
             self.ball_velocity = [
-                BALL_VELOCITY * np.cos(np.radians(self.player_input_right)),
-                -BALL_VELOCITY * np.sin(np.radians(self.player_input_right))
+                BALL_VELOCITY * math.cos(angle),
+                -BALL_VELOCITY * math.sin(angle)
             ]
             self.last_strike = 'right'
             self.bounces = 0
             
-        elif np.linalg.norm(self.ball_velocity):
+        elif math.hypot(*self.ball_velocity):
             # If no strikes, then process gravity
             self.ball_velocity = [
                 self.ball_velocity[0],
@@ -330,7 +368,7 @@ class TennisForTwoMainWindow():
                 (INPUT_BOX_WIDTH / 2, 10),
                 text='SCORE!', fill=COURT_COLOUR)
             # Schedule the celebratory text for deletion
-            self.master.after(1000, self._del_object, 
+            self.scheduler.after(1000, self._del_object, 
                 self.player_canvas_left, texth)
         if player_scored_right:
             # Increment the score counter
@@ -344,13 +382,13 @@ class TennisForTwoMainWindow():
                 (INPUT_BOX_WIDTH / 2, 10),
                 text='SCORE!', fill=COURT_COLOUR)
             # Schedule the celebratory text for deletion
-            self.master.after(1000, self._del_object, 
+            self.scheduler.after(1000, self._del_object, 
                 self.player_canvas_right, texth)
         # If one of the players scored, re-run the setup to start again
         if player_scored_left or player_scored_right:
             self._setup()
             # Do no restart this loop, setup will handle future calls
-            return
+            return False
         # Handle air drag
         self.ball_velocity = [
             self.ball_velocity[0] * (1 - AIR_RESISTANCE * dt),
@@ -361,16 +399,16 @@ class TennisForTwoMainWindow():
             self.ball_velocity[0] * dt,
             self.ball_velocity[1] * dt
         )
-        # Re-call this function for the next update
-        self.master.after(10, self._update)
+        return True
     def _del_object(self, canvas, handle):
         # Remove an object from the canvas (called with a delay from mainloop)
         canvas.delete(handle)
-    def _process_player_inputs(self):
+    def _process_player_inputs(self, dt=None):
         # Calculate time since last input update so that input rate does 
-        #   not depend on update rate
-        dt = gt(self.last_input_time or 0.0)
-        self.last_input_time = gt()
+        #   not depend on update rate (unless a fixed step was provided)
+        if dt is None:
+            dt = gt(self.last_input_time or 0.0)
+            self.last_input_time = gt()
         update_scalar = dt * INPUT_RATE
         # Check each players various inputs and update their input position
         if 'w' in self.inputs:
@@ -0,0 +1,326 @@
+## Imports
+# Built-ins
+import tkinter as tk
+import argparse
+import socket
+import struct
+import zlib
+
+# Pypi
+pass
+
+# Custom
+from tennis_for_two_like import TennisForTwoMainWindow, widgetgrid, gt
+
+# The fixed length of a lockstep tick
+NET_TICK_MS = 10
+NET_TICK = NET_TICK_MS / 1000.0     # seconds
+# How many ticks in the future local inputs are scheduled for
+DEFAULT_INPUT_DELAY = 3             # ticks
+# How many of the most recent input frames are sent in every packet so
+#   that a lost packet is covered by the ones after it
+INPUT_REDUNDANCY = 8                # ticks
+# How often the peers exchange state hashes to detect a desync
+HASH_INTERVAL = 25                  # ticks
+# How many of the most recent state hashes are sent in every hash packet
+#   so that a lost packet is covered by the ones after it
+HASH_REDUNDANCY = 4                 # hashes
+# How often to measure the round trip time
+PING_INTERVAL = 0.5                 # seconds
+# How long to wait before checking for a late remote input again
+STALL_RETRY_MS = 1
+# The default ports each side listens on for localhost play
+DEFAULT_PORTS = {'left': 50007, 'right': 50008}
+# The keys each side steers up, steers down and strikes with, the index in
+#   this tuple is the bit used for that key in an input frame
+SIDE_KEYS = {'left': ('w', 's', 'd'), 'right': ('Up', 'Down', 'Left')}
+# The packet types exchanged between the peers
+PACKET_INPUT = 1
+PACKET_HASH = 2
+PACKET_PING = 3
+PACKET_PONG = 4
+# The packet layouts (after the leading type byte)
+INPUT_HEADER = struct.Struct('!BIB')    # type, first tick, frame count
+HASH_HEADER = struct.Struct('!BIB')     # type, first tick, hash count
+HASH_VALUE = struct.Struct('!I')        # one state hash
+PING_PACKET = struct.Struct('!Bd')      # type, send timestamp
+
+class NetworkedTennisMainWindow(TennisForTwoMainWindow):
+    '''
+    Typical use case (one per machine, or two processes on localhost):
+        import tkinter as tk
+        root = tk.Tk()
+        mw = NetworkedTennisMainWindow(root, 'left',
+            ('0.0.0.0', 50007), ('127.0.0.1', 50008))
+        root.mainloop()
+    '''
+    def __init__(self, root, side, local_addr, peer_addr,
+            input_delay=DEFAULT_INPUT_DELAY):
+        # Which side of the court this machine plays
+        self.side = side
+        self.remote_side = 'right' if side == 'left' else 'left'
+        # The non-blocking UDP socket used to talk to the peer
+        self.peer_addr = peer_addr
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(local_addr)
+        self.sock.setblocking(False)
+        # The lockstep tick that will be simulated next
+        self.tick = 0
+        self.input_delay = input_delay
+        # The input bits for each tick, the first ticks are empty as no
+        #   inputs can be scheduled for them
+        self.local_frames = {tick: 0 for tick in range(input_delay)}
+        self.remote_frames = {tick: 0 for tick in range(input_delay)}
+        # The recent state hashes from both peers and the newest tick that
+        #   has been compared
+        self.local_hashes = {}
+        self.remote_hashes = {}
+        self.checked_tick = -1
+        # The first tick the peers disagreed on (None while in sync)
+        self.desync_tick = None
+        # The keys held down on this machine
+        self.local_keys = set()
+        # Network statistics
+        self.stalls = 0
+        self.stalled_tick = None
+        self.rtt = None
+        self.last_ping_time = 0.0
+        self.last_send_time = 0.0
+        # When the next tick is due
+        self.next_tick_time = None
+        super().__init__(root)
+        self.master.title('Tennis For Two Like ({0})'.format(side))
+        # A label to report the network status
+        self.netlabel = widgetgrid(
+            tk.Label,
+            {'master': self.mainframe, 'text': 'Waiting for peer . . .'},
+            {'row': 3, 'column': 0, 'columnspan': 3}
+        )
+
+    def _keydown(self, event):
+        # Only this machine's keys are recorded, the game inputs are
+        #   rebuilt from the input frames every tick
+        self.local_keys.add(event.keysym)
+
+    def _keyup(self, event):
+        self.local_keys.discard(event.keysym)
+
+    def _update(self):
+        if not self.running:
+            return
+        self._receive()
+        self._ping()
+        # Sample this machine's input for the tick it will be played on
+        target_tick = self.tick + self.input_delay
+        if target_tick not in self.local_frames:
+            self.local_frames[target_tick] = self._local_bits()
+            self._send_inputs()
+        # Wait for the peer if its input for this tick has not arrived
+        if self.tick not in self.remote_frames:
+            if self.stalled_tick != self.tick:
+                self.stalled_tick = self.tick
+                self.stalls += 1
+            # Resend in case the peer is waiting on a lost packet as well
+            if gt(self.last_send_time) >= NET_TICK:
+                self._send_inputs()
+            self.master.after(STALL_RETRY_MS, self._update)
+            return
+        # Rebuild the held keys for both sides from the input frames
+        self.inputs = self._frame_keys(self.side,
+            self.local_frames[self.tick])
+        self.inputs |= self._frame_keys(self.remote_side,
+            self.remote_frames[self.tick])
+        # Advance the game by exactly one tick on both machines
+        running = self._step(NET_TICK, NET_TICK)
+        # Exchange state hashes to check both machines agree
+        if self.tick % HASH_INTERVAL == 0:
+            self.local_hashes[self.tick] = self._state_hash()
+            self._send_hashes()
+            self._check_desync()
+            self._report()
+        # Forget frames that are no longer needed
+        self.remote_frames.pop(self.tick, None)
+        self.local_frames.pop(self.tick - INPUT_REDUNDANCY, None)
+        self.tick += 1
+        # If a player scored then setup has already scheduled the next update
+        if not running:
+            self.next_tick_time = None
+            return
+        # Pace the ticks to a fixed rate
+        if self.next_tick_time is None:
+            self.next_tick_time = gt()
+        self.next_tick_time += NET_TICK
+        delay = int((self.next_tick_time - gt()) * 1000)
+        if delay < 1:
+            # Fell too far behind, do not try to catch up
+            delay = 1
+            self.next_tick_time = gt()
+        self.master.after(delay, self._update)
+
+    def _local_bits(self):
+        # Pack this machine's held keys into input bits
+        bits = 0
+        for bit, key in enumerate(SIDE_KEYS[self.side]):
+            if key in self.local_keys:
+                bits |= 1 << bit
+        return bits
+
+    def _frame_keys(self, side, bits):
+        # Unpack input bits into the key names the game expects
+        return {key for bit, key in enumerate(SIDE_KEYS[side])
+            if bits & (1 << bit)}
+
+    def _state_hash(self):
+        # A hash of everything that determines how the game continues
+        state = (
+            tuple(self.mainview.coords(self.ball)),
+            tuple(self.ball_velocity),
+            self.player_input_left,
+            self.player_input_right,
+            self.player_score_left,
+            self.player_score_right,
+            self.last_strike,
+            self.bounces
+        )
+        return zlib.crc32(repr(state).encode())
+
+    def _send_hashes(self):
+        # Send the most recent state hashes, oldest first
+        first_tick = max(self.tick - (HASH_REDUNDANCY - 1) * HASH_INTERVAL, 0)
+        ticks = range(first_tick, self.tick + 1, HASH_INTERVAL)
+        self._send(HASH_HEADER.pack(PACKET_HASH, first_tick, len(ticks))
+            + b''.join(HASH_VALUE.pack(self.local_hashes[tick])
+                for tick in ticks))
+
+    def _check_desync(self):
+        # Compare every tick both peers have reported a hash for
+        for tick in sorted(set(self.local_hashes) & set(self.remote_hashes)):
+            local_hash = self.local_hashes[tick]
+            remote_hash = self.remote_hashes.pop(tick)
+            self.checked_tick = tick
+            if local_hash != remote_hash and self.desync_tick is None:
+                # The games have diverged, there is no way to recover
+                self.desync_tick = tick
+                self.running = False
+                self.netlabel.config(
+                    text='Desync detected at tick {0}'.format(tick))
+        # Forget hashes too old to be sent again, if every packet carrying
+        #   one of the peer's was lost then that tick goes unchecked
+        oldest = self.tick - (HASH_REDUNDANCY - 1) * HASH_INTERVAL
+        for hashes in (self.local_hashes, self.remote_hashes):
+            for tick in [tick for tick in hashes if tick < oldest]:
+                del hashes[tick]
+
+    def _report(self):
+        # Show the network statistics below the court
+        if self.desync_tick is not None:
+            return
+        self.netlabel.config(
+            text='Tick: {0}    RTT: {1}    Stalls: {2}'.format(
+                self.tick,
+                '-' if self.rtt is None else '{0:.1f} ms'.format(
+                    self.rtt * 1000),
+                self.stalls
+            )
+        )
+
+    def _send(self, data):
+        # Send a packet to the peer, a full socket buffer is treated as
+        #   a lost packet
+        try:
+            self.sock.sendto(data, self.peer_addr)
+        except (BlockingIOError, ConnectionError):
+            pass
+
+    def _send_inputs(self):
+        # Send the newest local input frames, older frames are repeated so
+        #   that a single lost packet does not stall the peer
+        last_tick = max(self.local_frames)
+        first_tick = max(min(self.local_frames),
+            last_tick - INPUT_REDUNDANCY + 1)
+        frames = bytes(self.local_frames[tick]
+            for tick in range(first_tick, last_tick + 1))
+        self._send(INPUT_HEADER.pack(PACKET_INPUT, first_tick,
+            len(frames)) + frames)
+        self.last_send_time = gt()
+
+    def _ping(self):
+        # Periodically measure the round trip time to the peer
+        if gt(self.last_ping_time) >= PING_INTERVAL:
+            self.last_ping_time = gt()
+            self._send(PING_PACKET.pack(PACKET_PING, self.last_ping_time))
+
+    def _receive(self):
+        # Process every packet waiting on the socket
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except BlockingIOError:
+                return
+            except ConnectionError:
+                # The peer is not listening yet (reported on some platforms)
+                continue
+            if not data:
+                continue
+            if data[0] == PACKET_INPUT \
+                    and len(data) >= INPUT_HEADER.size:
+                _, first_tick, count = INPUT_HEADER.unpack_from(data)
+                frames = data[INPUT_HEADER.size:INPUT_HEADER.size + count]
+                for tick, bits in enumerate(frames, first_tick):
+                    # Ignore frames that have already been played
+                    if tick >= self.tick:
+                        self.remote_frames.setdefault(tick, bits)
+            elif data[0] == PACKET_HASH and len(data) >= HASH_HEADER.size:
+                _, first_tick, count = HASH_HEADER.unpack_from(data)
+                for index in range(count):
+                    offset = HASH_HEADER.size + index * HASH_VALUE.size
+                    if offset + HASH_VALUE.size > len(data):
+                        break
+                    tick = first_tick + index * HASH_INTERVAL
+                    # Ignore hashes that have already been compared
+                    if tick > self.checked_tick:
+                        self.remote_hashes[tick] = \
+                            HASH_VALUE.unpack_from(data, offset)[0]
+            elif data[0] == PACKET_PING and len(data) == PING_PACKET.size:
+                # Echo the timestamp back so the peer can time the trip
+                self._send(bytes([PACKET_PONG]) + data[1:])
+            elif data[0] == PACKET_PONG and len(data) == PING_PACKET.size:
+                _, sent = PING_PACKET.unpack(data)
+                rtt = gt(sent)
+                # Smooth the round trip time so the display is readable
+                self.rtt = rtt if self.rtt is None \
+                    else 0.875 * self.rtt + 0.125 * rtt
+
+def _parse_addr(text):
+    # Convert host:port into an address tuple
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description='Play Tennis For Two Like against another machine')
+    parser.add_argument('--side', choices=('left', 'right'), default='left',
+        help='which side of the court this machine plays')
+    parser.add_argument('--port', type=int, default=None,
+        help='the local UDP port to listen on')
+    parser.add_argument('--peer', default=None,
+        help='the host:port of the other machine')
+    parser.add_argument('--delay', type=int, default=DEFAULT_INPUT_DELAY,
+        help='the input delay in ticks of {0} ms'.format(NET_TICK_MS))
+    args = parser.parse_args()
+    # Default to the other side's port on localhost
+    other = 'right' if args.side == 'left' else 'left'
+    port = args.port or DEFAULT_PORTS[args.side]
+    peer = _parse_addr(args.peer or ':{0}'.format(DEFAULT_PORTS[other]))
+    root = tk.Tk()
+    mw = NetworkedTennisMainWindow(root, args.side, ('0.0.0.0', port), peer,
+        args.delay)
+    root.mainloop()
+    mw.sock.close()
+    print('Ticks: {0}  Stalls: {1}  RTT: {2}  Desync tick: {3}'.format(
+        mw.tick, mw.stalls,
+        '-' if mw.rtt is None else '{0:.1f} ms'.format(mw.rtt * 1000),
+        mw.desync_tick))
+
+if __name__ == '__main__':
+    _main()
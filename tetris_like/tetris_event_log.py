@@ -0,0 +1,222 @@
+## Imports
+# Built-ins
+import argparse
+import os
+import struct
+
+# Pypi
+import numpy
+
+# Custom
+import tetris_like
+
+# Every event log file starts with this marker and the number of records
+MAGIC = b'TTRSEVT1'
+HEADER = struct.Struct('<8sQ')
+# The kinds of event recorded
+EVENT_LOCK = 0
+EVENT_CLEAR = 1
+# The layout of each fixed-size record
+EVENT_DTYPE = numpy.dtype([
+    ('game', '<u4'),            # which game in the log
+    ('tick', '<u4'),            # how many times the stone had moved down
+    ('event', 'u1'),            # EVENT_LOCK or EVENT_CLEAR
+    ('piece', 'u1'),            # index into tetris_like.shapes
+    ('rotation', 'u1'),         # index into the piece's parts
+    ('column', 'i1'),           # the piece's position from the left
+    ('lines_cleared', 'u1'),    # rows cleared by this lock
+    ('stack_height', 'u1'),     # height of the locked blocks afterwards
+])
+# How many records the file grows by at a time and are read at a time
+CHUNK_RECORDS = 65536
+# The largest number of rows cleared at once
+MAX_LINES_CLEARED = 4
+
+class EventLogWriter():
+    '''
+    Typical use case:
+        import tkinter as tk
+        log = EventLogWriter('events.bin')
+        root = tk.Tk()
+        mw = TetrisMainWindow(root, event_log=log)
+        root.mainloop()
+        log.close()
+    '''
+    def __init__(self, path, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.chunk_records = chunk_records
+        # Append to an existing log or start a new one
+        if os.path.exists(path) and os.path.getsize(path):
+            self.fh = open(path, 'r+b')
+            self.count = _read_header(self.fh)
+        else:
+            self.fh = open(path, 'w+b')
+            self.count = 0
+            self.fh.write(HEADER.pack(MAGIC, 0))
+        # The record count in the header is mapped too and updated with
+        #   every record, so a game that never closes its log (a crash or a
+        #   killed process) still leaves a readable, appendable file
+        self.header = numpy.memmap(self.fh, dtype='<u8', mode='r+',
+            offset=len(MAGIC), shape=(1,))
+        # The file is grown a chunk at a time so that appending is only a
+        #   write into the mapped records
+        self.capacity = self.count
+        self.records = None
+        self._grow()
+        # Carry on numbering games after the ones already in the log
+        self.game_count = int(self.records[self.count - 1]['game']) + 1 \
+            if self.count else 0
+
+    def _grow(self):
+        # Extend the file by a chunk and map the records again
+        if self.records is not None:
+            self.records.flush()
+            self.records = None
+        self.capacity += self.chunk_records
+        self.fh.truncate(HEADER.size + self.capacity * EVENT_DTYPE.itemsize)
+        self.records = numpy.memmap(self.fh, dtype=EVENT_DTYPE, mode='r+',
+            offset=HEADER.size, shape=(self.capacity,))
+
+    def new_game(self):
+        # Start numbering the events of another game
+        self.game_count += 1
+        return self.game_count - 1
+
+    def append(self, game, tick, event, piece, rotation, column,
+            lines_cleared, stack_height):
+        # Write one record
+        if self.count == self.capacity:
+            self._grow()
+        self.records[self.count] = (game, tick, event, piece, rotation,
+            column, lines_cleared, stack_height)
+        self.count += 1
+        # Only count the record once it has been written
+        self.header[0] = self.count
+
+    def lock(self, game, tick, piece, rotation, column, lines_cleared,
+            stack_height):
+        self.append(game, tick, EVENT_LOCK, piece, rotation, column,
+            lines_cleared, stack_height)
+
+    def clear(self, game, tick, piece, rotation, column, lines_cleared,
+            stack_height):
+        self.append(game, tick, EVENT_CLEAR, piece, rotation, column,
+            lines_cleared, stack_height)
+
+    def flush(self):
+        # Write the mapped records and count back to the file
+        self.records.flush()
+        self.header.flush()
+
+    def close(self):
+        # Flush and trim the unused end of the last chunk
+        if self.fh.closed:
+            return
+        self.flush()
+        self.records = None
+        self.header = None
+        self.fh.truncate(HEADER.size + self.count * EVENT_DTYPE.itemsize)
+        self.fh.close()
+
+class EventLogReader():
+    '''
+    Typical use case:
+        log = EventLogReader('events.bin')
+        print(len(log), log.piece_counts(len(shapes)))
+        for chunk in log.chunks():
+            ...
+    '''
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fh:
+            self.count = _read_header(fh)
+        # The records are mapped rather than read, so only the pages being
+        #   worked on need to be in memory
+        if self.count:
+            self.records = numpy.memmap(path, dtype=EVENT_DTYPE, mode='r',
+                offset=HEADER.size, shape=(self.count,))
+        else:
+            self.records = numpy.zeros(0, dtype=EVENT_DTYPE)
+
+    def __len__(self):
+        return self.count
+
+    def chunks(self, chunk_records=CHUNK_RECORDS):
+        # Yield views of consecutive records so that aggregations only ever
+        #   hold one chunk's temporaries however large the log is
+        for start in range(0, self.count, chunk_records):
+            yield self.records[start:start + chunk_records]
+
+    def game_count(self):
+        # Games are written one after another so the last record has the
+        #   highest game number
+        if not self.count:
+            return 0
+        return int(self.records[self.count - 1]['game']) + 1
+
+    def piece_counts(self, pieces):
+        # How many times each piece was locked
+        counts = numpy.zeros(pieces, dtype=numpy.int64)
+        for chunk in self.chunks():
+            locks = chunk['piece'][chunk['event'] == EVENT_LOCK]
+            counts += numpy.bincount(locks, minlength=pieces)[:pieces]
+        return counts
+
+    def column_counts(self, width):
+        # How many times a piece was locked at each column
+        counts = numpy.zeros(width, dtype=numpy.int64)
+        for chunk in self.chunks():
+            columns = chunk['column'][chunk['event'] == EVENT_LOCK]
+            columns = numpy.clip(columns, 0, width - 1).astype(numpy.intp)
+            counts += numpy.bincount(columns, minlength=width)
+        return counts
+
+    def clear_counts(self):
+        # How many clears removed 1, 2, 3 or 4 rows (index 0 is unused)
+        counts = numpy.zeros(MAX_LINES_CLEARED + 1, dtype=numpy.int64)
+        for chunk in self.chunks():
+            lines = chunk['lines_cleared'][chunk['event'] == EVENT_CLEAR]
+            counts += numpy.bincount(numpy.minimum(lines, MAX_LINES_CLEARED),
+                minlength=MAX_LINES_CLEARED + 1)
+        return counts
+
+    def mean_stack_height(self):
+        # The average height of the stack just after each lock
+        total = 0
+        locks = 0
+        for chunk in self.chunks():
+            heights = chunk['stack_height'][chunk['event'] == EVENT_LOCK]
+            total += int(heights.sum(dtype=numpy.int64))
+            locks += len(heights)
+        return total / locks if locks else 0.0
+
+def _read_header(fh):
+    # Check the file is an event log and return how many records it holds
+    fh.seek(0)
+    magic, count = HEADER.unpack(fh.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError('{0} is not a Tetris-Like event log'.format(fh.name))
+    return count
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description='Summarise a Tetris-Like event log')
+    parser.add_argument('path', help='the event log to read')
+    args = parser.parse_args()
+    log = EventLogReader(args.path)
+    print('{0} events from {1} games'.format(len(log), log.game_count()))
+    print('Mean stack height after a lock: {0:.2f}'.format(
+        log.mean_stack_height()))
+    print('Pieces locked:')
+    for shape, count in zip(tetris_like.shapes,
+            log.piece_counts(len(tetris_like.shapes))):
+        print('    {0}: {1}'.format(shape['name'], count))
+    print('Locks per column: {0}'.format(
+        ' '.join(str(count) for count in
+            log.column_counts(tetris_like.GAME_WIDTH))))
+    print('Clears by rows removed:')
+    for lines, count in enumerate(log.clear_counts()[1:], 1):
+        print('    {0}: {1}'.format(lines, count))
+
+if __name__ == '__main__':
+    _main()
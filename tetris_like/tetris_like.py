@@ -2,12 +2,22 @@
 # Built-ins
 import tkinter as tk
 import time
+import random
+import os
+import sys
 
 # Pypi
-import numpy
+pass
 
 # Custom
-pass
+# The frame profiler is only imported when it has been switched on so that
+#   it costs nothing otherwise
+if os.environ.get('SIMPLE_GAMES_PROFILE'):
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        os.pardir, 'frame_profiler'))
+    import frame_profiler
+else:
+    frame_profiler = None
 
 # The number of pixels of each side of a box
 BASE_LEN = 25
@@ -18,6 +28,8 @@ GAME_HEIGHT = 25
 GAME_DIFFICULTY_RATE = 0.1
 # The difficult the game starts at in updates / second
 GAME_BASE_DIFFICULTY = 5.0
+# How often the labels are allowed to change in updates / second
+HUD_REFRESH_RATE = 10.0
 # The various shapes that the game uses along with each rotation
 shapes = [
     {'name': 'I', 'colour': '#55FFAA', 'parts': (
@@ -54,6 +66,16 @@ shapes = [
         ((0, 0), (0, 1), (1, 0), (1, 1)),
     )}
 ]
+# The calls timed by the frame profiler in each phase of an update
+PROFILE_PHASES = {
+    'input': ['_process_inputs'],
+    'collision': ['_check_collisions'],
+    'row_clearance': ['_process_row_clearance'],
+    'canvas': ['gamecanvas.create_rectangle', 'gamecanvas.delete',
+        'previewcanvas.create_rectangle', 'previewcanvas.delete'],
+    'labels': ['speedlabel.config', 'statuslabel.config',
+        'countlabel.config', 'clearedlabel.config']
+}
 # A convenience function to make it shorter to make and grid widgets
 def widgetgrid(widget, widget_options, grid_options):
     # Create the widget
@@ -65,6 +87,47 @@ def widgetgrid(widget, widget_options, grid_options):
 # A standardized timing function
 def gt(start=0.0):
     return time.perf_counter() - start
+# Keeps the labels up to date without touching Tk when nothing has changed
+class Hud():
+    '''
+    Typical use case:
+        hud = Hud({'speed': (speedlabel, 'Game speed: {0:.1f}')})
+        hud.set('speed', 5.0)
+        hud.refresh()
+    '''
+    def __init__(self, labels, refresh_rate=HUD_REFRESH_RATE):
+        # The label and format string for each value
+        self.labels = labels
+        self.refresh_period = 1 / refresh_rate
+        # The latest values and the text each label is currently showing
+        self.values = {name: None for name in labels}
+        self.texts = {name: None for name in labels}
+        # Whether a value changed since the last refresh
+        self.changed = False
+        self.last_refresh = None
+    def set(self, name, value):
+        # Record a value, it is shown on the next refresh
+        if value != self.values[name]:
+            self.values[name] = value
+            self.changed = True
+    def refresh(self, force=False):
+        # Push changed text to the labels, at most refresh_rate times a
+        #   second unless forced
+        if not self.changed:
+            return
+        if not force and self.last_refresh is not None \
+                and gt(self.last_refresh) < self.refresh_period:
+            return
+        for name, (label, text_format) in self.labels.items():
+            if self.values[name] is None:
+                continue
+            text = text_format.format(self.values[name])
+            # Only labels whose text would differ are updated
+            if text != self.texts[name]:
+                label.config(text=text)
+                self.texts[name] = text
+        self.changed = False
+        self.last_refresh = gt()
 # The main class which contains all the game logic
 class TetrisMainWindow():
     '''
@@ -74,8 +137,17 @@ class TetrisMainWindow():
         mw = TetrisMainWindow(root)
         root.mainloop()
     '''
-    def __init__(self, root):
+    def __init__(self, root, seed=None, scheduler=None,
+            hud_refresh_rate=HUD_REFRESH_RATE, event_log=None):
         self.master = root
+        # Where piece locks and row clears are recorded (optional, see
+        #   tetris_event_log.EventLogWriter)
+        self.event_log = event_log
+        # The number of this game in the event log
+        self.game_id = None
+        # What the updates are scheduled with (a shared frame scheduler
+        #   when hosted with other games, otherwise the window itself)
+        self.scheduler = scheduler or root
         self.master.title('Tetris-Like')
         # Store the run_id so that previous runs' processes can be ended
         self.run_id = 0
@@ -88,6 +160,8 @@ class TetrisMainWindow():
         self.stone_count = None
         # How many rows have been cleared
         self.cleared_count = None
+        # How many times the active stone has moved down
+        self.tick = None
         # The last update time (to determine when to perform the next update)
         self.last_update = None
         # The current position of the active stone
@@ -105,7 +179,8 @@ class TetrisMainWindow():
         # A list of all blocks references to facilitate updating
         self.all_blocks = []
         # A random number generator to generate next block types
-        self.rng = numpy.random.default_rng()
+        #   (seeded to replay the same sequence of pieces)
+        self.rng = random.Random(seed)
         # The mainframe contains all of the stuff in the game window
         self.mainframe = widgetgrid(tk.Frame, {'master': self.master},
             {'row': 0, 'column': 0})
@@ -141,6 +216,13 @@ class TetrisMainWindow():
         # This label shows the number of cleared lines
         self.clearedlabel = widgetgrid(tk.Label,
             {'master': self.mainframe, 'text': ''}, {'row': 4, 'column': 1})
+        # The labels are only updated through the hud
+        self.hud = Hud({
+            'speed': (self.speedlabel, 'Game speed: {0:.1f}'),
+            'status': (self.statuslabel, '{0}'),
+            'count': (self.countlabel, 'Stone count : {0}'),
+            'cleared': (self.clearedlabel, 'Rows cleared: {0}')
+        }, hud_refresh_rate)
         # This button allows the user to start a fresh game
         self.resetbutton = widgetgrid(tk.Button,
             {'master': self.mainframe, 'text': 'Restart',
@@ -150,6 +232,11 @@ class TetrisMainWindow():
         # This calls our _keydown function for key presses anywhere on 
         #   our window so that we can process the use input
         self.master.bind('<KeyPress>', self._keydown)
+        # Time each update if the frame profiler is switched on
+        self.profiler = None
+        if frame_profiler:
+            self.profiler = frame_profiler.attach(self, '_update',
+                PROFILE_PHASES)
         # Run the setup and start running
         #   This can be removed to have the user click "Reset" to start
         self._setup()
@@ -159,7 +246,11 @@ class TetrisMainWindow():
         self.gamecanvas.delete('all')
         self.stone_count = 0
         self.cleared_count = 0
+        self.tick = 0
         self.last_update = gt()
+        # Start a new game in the event log
+        if self.event_log:
+            self.game_id = self.event_log.new_game()
         # Spawn a new piece at the middle top
         self.current_pos = [GAME_WIDTH // 2, 0]
         self.current_piece = shapes[0]
@@ -167,18 +258,22 @@ class TetrisMainWindow():
             self.gamecanvas, self.current_pos)
         self.current_piece_rot = 0
         # Load the next piece into the preview window
-        self.preview_piece = shapes[self.rng.integers(len(shapes))]
+        self.preview_piece = shapes[self.rng.randrange(len(shapes))]
         # Record the first update time to calculate difficulty level later
         self.first_update = gt()
         # Reset the tracker for all the "locked" blocks on the screen
         self.all_blocks = []
         # Reset the difficulty
         self.update_rate = GAME_BASE_DIFFICULTY
-        # Set the text to running
-        self.statuslabel.config(text='Running . . .')
+        # Set the text to running and show the fresh values straight away
+        self.hud.set('speed', self.update_rate)
+        self.hud.set('status', 'Running . . .')
+        self.hud.set('count', self.stone_count)
+        self.hud.set('cleared', self.cleared_count)
+        self.hud.refresh(force=True)
         # Record the run_id and start the game
         self.run_id += 1
-        self.master.after(1, self._update, self.run_id)
+        self.scheduler.after(1, self._update, self.run_id)
     
     def _check_collisions(self, shape=None, pos=None, rot=None):
         # Check to see if a shape collides with any of the "locked" blocks
@@ -224,32 +319,14 @@ class TetrisMainWindow():
         check_collision = False
         # Process user input
         if len(self.keys):
-            # This stores the lateral translation input
-            translateval = 0
-            # This stores the rotation input
-            rotval = 0
-            if 'Up' in self.keys:
-                rotval = 1
-            if 'Left' in self.keys:
-                translateval += -1
-            if 'Right' in self.keys:
-                translateval += 1
-            # If no collisions resulted from the user input, perform it
-            #   and redraw
-            pos=[self.current_pos[0] + translateval, self.current_pos[1]]
-            rot=self.current_piece_rot + rotval
-            if not self._check_collisions(pos=pos, rot=rot):
-                self.current_pos[0] += translateval
-                self.current_piece_rot += rotval
-                self._redraw()
-            # Reset the user inputs
-            self.keys = []
+            self._process_inputs()
         # Move piece
         if gt(self.last_update) > 1 / self.update_rate:
             # We moved the piece we need to check for collisions
             check_collision = True
             # Move the piece down one position
             self.current_pos[1] += 1
+            self.tick += 1
             # Redraw it
             self._redraw()
             # Update the last_update and update_rate
@@ -275,22 +352,15 @@ class TetrisMainWindow():
                         ]
                     )
                 # Check for and perform row clearance
+                lock_height = self._stack_height()
+                cleared_before = self.cleared_count
                 self._process_row_clearance()
-                # Reset the current piece data
-                self.current_piece_handles = []
-                self.current_piece_rot = 0
-                self.current_piece = self.preview_piece
-                self.current_pos = [GAME_WIDTH // 2, 0]
-                # Generate a new preview piece
-                self.preview_piece = shapes[self.rng.integers(len(shapes))]
-                # Reset the preview canvas and draw the next preview to it
-                self.previewcanvas.delete('all')
-                self._draw_shape(self.preview_piece, self.previewcanvas, 
-                    (1, 1), self.current_piece_rot)
-                # Increment the stone count
-                self.stone_count += 1
-                self.countlabel.config(
-                    text='Stone count : {0}'.format(self.stone_count))
+                # Record the lock (and the clear it caused)
+                if self.event_log:
+                    self._log_lock(lock_height,
+                        self.cleared_count - cleared_before)
+                # Bring in the next piece
+                self._spawn_piece()
                 # If the new piece has collisions, kill the player 
                 #   (i.e., no space to spawn a new piece)
                 kill_player = self._check_collisions()
@@ -298,15 +368,68 @@ class TetrisMainWindow():
                 #   and do not recall this function
                 if kill_player:
                     self.update_rate = 0
-                    self.statuslabel.config(text='Dead :(')
+                    self.hud.set('speed', self.update_rate)
+                    self.hud.set('status', 'Dead :(')
+                    self.hud.set('cleared', self.cleared_count)
+                    self.hud.refresh(force=True)
                     return
         
-        # Reset labels and _update function
-        self.speedlabel.config(
-            text='Game speed: {0:.1f}'.format(self.update_rate))
-        self.clearedlabel.config(
-            text='Rows cleared: {0}'.format(self.cleared_count))
-        self.master.after(1, self._update, run_id)
+        # Update labels (if they changed) and _update function
+        self.hud.set('speed', self.update_rate)
+        self.hud.set('cleared', self.cleared_count)
+        self.hud.refresh()
+        self.scheduler.after(1, self._update, run_id)
+    def _stack_height(self):
+        # How many rows high the locked blocks reach
+        if not self.all_blocks:
+            return 0
+        return GAME_HEIGHT - min(block[1] for block in self.all_blocks)
+    def _log_lock(self, lock_height, lines_cleared):
+        # Write the current piece's lock, and any clear, to the event log
+        event = (self.game_id, self.tick, shapes.index(self.current_piece),
+            self.current_piece_rot % len(self.current_piece['parts']),
+            self.current_pos[0], lines_cleared)
+        self.event_log.lock(*event, lock_height)
+        if lines_cleared:
+            self.event_log.clear(*event, self._stack_height())
+    def _spawn_piece(self):
+        # Make the preview piece the active stone at the middle top
+        # Reset the current piece data
+        self.current_piece_handles = []
+        self.current_piece_rot = 0
+        self.current_piece = self.preview_piece
+        self.current_pos = [GAME_WIDTH // 2, 0]
+        # Generate a new preview piece
+        self.preview_piece = shapes[self.rng.randrange(len(shapes))]
+        # Reset the preview canvas and draw the next preview to it
+        self.previewcanvas.delete('all')
+        self._draw_shape(self.preview_piece, self.previewcanvas, 
+            (1, 1), self.current_piece_rot)
+        # Increment the stone count
+        self.stone_count += 1
+        self.hud.set('count', self.stone_count)
+    def _process_inputs(self):
+        # Move and rotate the active stone based on the keys pressed
+        # This stores the lateral translation input
+        translateval = 0
+        # This stores the rotation input
+        rotval = 0
+        if 'Up' in self.keys:
+            rotval = 1
+        if 'Left' in self.keys:
+            translateval += -1
+        if 'Right' in self.keys:
+            translateval += 1
+        # If no collisions resulted from the user input, perform it
+        #   and redraw
+        pos=[self.current_pos[0] + translateval, self.current_pos[1]]
+        rot=self.current_piece_rot + rotval
+        if not self._check_collisions(pos=pos, rot=rot):
+            self.current_pos[0] += translateval
+            self.current_piece_rot += rotval
+            self._redraw()
+        # Reset the user inputs
+        self.keys = []
     def _process_row_clearance(self):
         # Check for row removals
         # Hold a flag to indicate if a redraw is necessary
@@ -337,7 +460,7 @@ class TetrisMainWindow():
                 new_handle = self._draw_shape(
                     {'parts':[[(0,0)]], 'colour': block[3]},
                     self.gamecanvas, block)
-                block[2] = new_handle
+                block[2] = new_handle[0]['handle']
     def _keydown(self, e):
         # When a user presses a key, record that
         #   This can be updated to operate continuously
@@ -362,9 +485,21 @@ class TetrisMainWindow():
         return handles
 
 def _main():
-    root = tk.Tk()
-    mw = TetrisMainWindow(root)
-    root.mainloop()
+    # Record the games if an event log was requested, the log (and numpy)
+    #   is only imported when it is used
+    event_log = None
+    if os.environ.get('TETRIS_EVENT_LOG'):
+        import tetris_event_log
+        event_log = tetris_event_log.EventLogWriter(
+            os.environ['TETRIS_EVENT_LOG'])
+    try:
+        root = tk.Tk()
+        mw = TetrisMainWindow(root, event_log=event_log)
+        root.mainloop()
+    finally:
+        # Close the log even when interrupted so the file is trimmed
+        if event_log:
+            event_log.close()
 
 if __name__ == '__main__':
     _main()
\ No newline at end of file